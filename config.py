@@ -6,6 +6,16 @@ BASE_URL = 'https://paper-api.alpaca.markets'
 
 api = REST(API_KEY, SECRET_KEY, BASE_URL, api_version='v2')
 
+# Strategy variants for src/run_multi.py. Each entry overrides the defaults in
+# execute_trades.default_strategy(). Give every strategy its own paper account
+# (api_key / secret_key), otherwise they trade the same positions.
+STRATEGIES = [
+    {'name': 'baseline'},
+    # {'name': 'aggressive', 'api_key': '...', 'secret_key': '...',
+    #  'buy_threshold': 0.55, 'stop_loss_pct': -0.03, 'take_profit_pct': 0.08,
+    #  'model_dir': 'models'},
+]
+
 if __name__ == '__main__':
     account = api.get_account()
     print(f"Account status: {account.status}")
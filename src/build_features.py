@@ -1,86 +1,83 @@
+"""
+Build technical-indicator features.
 
+By default reads daily bars from data/{ticker}.csv. With --interval, stored
+intraday bars (see bars.py) are resampled to that interval first; windows are
+counted in bars, so the same code runs at 5m, 1h or daily resolution. Daily
+features built from intraday bars use realized volatility in place of the
+Parkinson estimator.
 
+Usage: python src/build_features.py [--interval 5m|1h|1d] [--source 1m]
+"""
+
+import argparse
 import pandas as pd
-import numpy as np
+
+from bars import load_bars, resample_bars, realized_volatility, periods_per_year
+from features import compute_features, INTERMEDIATES
 
 tickers = ['AAPL', 'MSFT', 'GOOGL', 'AMZN', 'NVDA']
 
-for ticker in tickers:
-    df = pd.read_csv(f'data/{ticker}.csv', parse_dates=[0])
-
-    # ==================== RETURNS ====================
-    df['return_cc'] = df['Close'].pct_change()
-    df['return_oc'] = (df['Close'] - df['Open']) / df['Open']
-    df['overnight_gap'] = (df['Open'] - df['Close'].shift(1)) / df['Close'].shift(1)
-    df['upside'] = (df['High'] - df['Close'].shift(1)) / df['Close'].shift(1)
-    df['downside'] = (df['Low'] - df['Close'].shift(1)) / df['Close'].shift(1)
-
-    # ==================== MOVING AVERAGES ====================
-    df['ma_10'] = df['Close'].rolling(window=10).mean()
-    df['ma_50'] = df['Close'].rolling(window=50).mean()
-    df['price_vs_ma10'] = (df['Close'] - df['ma_10']) / df['ma_10']
-    df['price_vs_ma50'] = (df['Close'] - df['ma_50']) / df['ma_50']
-    df['ma_diff'] = (df['ma_10'] - df['ma_50']) / df['ma_50']
-    df['ma_10_slope'] = df['ma_10'].pct_change(5)
-    df['ma_50_slope'] = df['ma_50'].pct_change(5)
-
-    # ==================== VOLATILITY ====================
-    df['volatility_10'] = df['return_cc'].rolling(window=10).std()
-    df['volatility_50'] = df['return_cc'].rolling(window=50).std()
-    df['vol_ratio'] = df['volatility_10'] / df['volatility_50']
-    df['volatility_annual'] = df['volatility_10'] * (252 ** 0.5)
-    df['parkinson_vol'] = np.sqrt(
-        (1 / (4 * np.log(2))) * (np.log(df['High'] / df['Low']) ** 2)
-    ).rolling(window=10).mean()
-    df['vol_change'] = df['volatility_10'].pct_change(5)
-
-    # ==================== HIGH-LOW FEATURES ====================
-    df['intraday_range'] = (df['High'] - df['Low']) / df['Close']
-    df['close_position'] = (df['Close'] - df['Low']) / (df['High'] - df['Low'])
-
-    # ==================== RSI (NEW) ====================
-    delta = df['Close'].diff()
-    gain = delta.where(delta > 0, 0).rolling(14).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(14).mean()
-    df['rsi'] = 100 - (100 / (1 + gain / loss))
-
-    # ==================== MACD (NEW) ====================
-    df['ema_12'] = df['Close'].ewm(span=12).mean()
-    df['ema_26'] = df['Close'].ewm(span=26).mean()
-    df['macd'] = df['ema_12'] - df['ema_26']
-    df['macd_signal'] = df['macd'].ewm(span=9).mean()
-    df['macd_hist'] = df['macd'] - df['macd_signal']
-    # Normalize MACD by price so it's comparable across stocks
-    df['macd_norm'] = df['macd'] / df['Close']
-    df['macd_signal_norm'] = df['macd_signal'] / df['Close']
-    df['macd_hist_norm'] = df['macd_hist'] / df['Close']
-
-    # ==================== VOLUME FEATURES (NEW) ====================
-    df['volume_ma_10'] = df['Volume'].rolling(10).mean()
-    df['volume_ma_50'] = df['Volume'].rolling(50).mean()
-    df['volume_ratio'] = df['Volume'] / df['volume_ma_10']
-    df['volume_trend'] = df['volume_ma_10'] / df['volume_ma_50']
-    # Price-volume relationship
-    df['price_volume'] = df['return_cc'] * df['volume_ratio']
-
-    # ==================== DAY OF WEEK (NEW) ====================
-    date_col = df.columns[0]
-    df['day_of_week'] = pd.to_datetime(df[date_col]).dt.dayofweek
+
+def build_features(df, bars_per_year=252, threshold=0.002):
+    """Add indicators and the next-bar target to an OHLCV frame (Date first).
+
+    If the frame carries a per-bar 'realized_vol' column, its 10-bar mean
+    replaces the Parkinson range estimator.
+    """
+    compute_features(df, bars_per_year=bars_per_year)
 
     # ==================== TARGET ====================
-    threshold = 0.002
     df['target'] = (df['Close'].pct_change().shift(-1) > threshold).astype(int)
 
     # ==================== CLEANUP ====================
-    # Drop raw MACD/EMA columns (keep normalized versions)
-    df.drop(columns=['ema_12', 'ema_26', 'macd', 'macd_signal', 'macd_hist'], inplace=True)
-
-    print(f"{ticker}: {len(df)} rows before cleanup")
-    print(df.isna().sum()[df.isna().sum() > 0])
-    df.dropna(inplace=True)
-    df.reset_index(drop=True, inplace=True)
-    print(f"{ticker}: {len(df)} rows after cleanup")
-
-    # Save
-    df.to_csv(f'data/{ticker}_features.csv', index=False)
-    print(f"Saved data/{ticker}_features.csv\n")
+    # Drop raw MACD/EMA columns (keep normalized versions), and the raw
+    # per-bar realized vol, which the live (yfinance daily) path can't produce
+    df.drop(columns=INTERMEDIATES, inplace=True)
+    df.drop(columns=['realized_vol'], errors='ignore', inplace=True)
+    return df
+
+
+def feature_path(ticker, interval=None):
+    """Feature file for a ticker: daily by default, else built with --interval."""
+    if interval:
+        return f'data/{ticker}_{interval}_features.csv'
+    return f'data/{ticker}_features.csv'
+
+
+def load_resampled(ticker, interval, source='1m'):
+    """Resample stored intraday bars to interval, as a frame with a Date column."""
+    bars = load_bars(ticker, source)
+    df = resample_bars(bars, interval)
+    if pd.Timedelta(interval) >= pd.Timedelta('1d'):
+        df['realized_vol'] = realized_volatility(bars, interval)
+    df.index = df.index.tz_localize(None)
+    df.index.name = 'Date'
+    return df.reset_index()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Build feature files.')
+    parser.add_argument('--interval', help='resample stored intraday bars to '
+                        'this interval (e.g. 5m, 1h, 1d) instead of reading data/{ticker}.csv')
+    parser.add_argument('--source', default='1m', help='stored bar interval to resample from')
+    args = parser.parse_args()
+
+    for ticker in tickers:
+        if args.interval:
+            df = load_resampled(ticker, args.interval, args.source)
+            df = build_features(df, bars_per_year=periods_per_year(args.interval))
+        else:
+            df = pd.read_csv(f'data/{ticker}.csv', parse_dates=[0])
+            df = build_features(df)
+        out_path = feature_path(ticker, args.interval)
+
+        print(f"{ticker}: {len(df)} rows before cleanup")
+        print(df.isna().sum()[df.isna().sum() > 0])
+        df.dropna(inplace=True)
+        df.reset_index(drop=True, inplace=True)
+        print(f"{ticker}: {len(df)} rows after cleanup")
+
+        # Save
+        df.to_csv(out_path, index=False)
+        print(f"Saved {out_path}\n")
@@ -0,0 +1,183 @@
+"""
+DRIFT MONITOR
+Scores live predictions against what actually happened, to decide whether a
+full retrain is needed or an incremental update is enough.
+
+Each bot run logs the model's UP confidence per ticker in data/trade_log.json.
+A prediction made on day d is resolved with the next close after d from
+data/{ticker}.csv, using the same up/down threshold as the training target.
+Over the last DRIFT_WINDOW resolved predictions a ticker has drifted if,
+with one-sided significance Z_CRITICAL:
+  - accuracy is significantly below 50%, or
+  - its Brier score is significantly worse than a constant forecast of the
+    training-period base rate (paired test on per-prediction errors)
+
+Z_CRITICAL is set for roughly a 5% false-alarm rate across all five tickers.
+Even with drift, a full rebuild runs at most once every
+MIN_DAYS_BETWEEN_FULL days (recorded in data/retrain_state.json). A missing
+model, or one at update_model.MAX_ESTIMATORS, always needs a full rebuild.
+
+Usage: python src/drift_monitor.py
+"""
+
+import os
+import json
+from datetime import date
+import joblib
+import numpy as np
+import pandas as pd
+
+from update_model import at_capacity
+
+tickers = ['AAPL', 'MSFT', 'GOOGL', 'AMZN', 'NVDA']
+
+LOG_FILE = 'data/trade_log.json'
+STATE_FILE = 'data/retrain_state.json'
+TARGET_THRESHOLD = 0.002   # same as the target in build_features.py
+TRAIN_FRAC = 0.8           # training period, same split as train_model.py
+DRIFT_WINDOW = 60          # most recent resolved predictions to score
+MIN_RESOLVED = 30          # fewer than this: not enough evidence either way
+Z_CRITICAL = 2.33          # one-sided 1% per ticker (~5% over five tickers)
+MIN_DAYS_BETWEEN_FULL = 30
+
+
+# ==================== FULL RETRAIN STATE ====================
+
+def last_full_retrain():
+    """Date of the last full rebuild, or None if never recorded."""
+    if not os.path.exists(STATE_FILE):
+        return None
+    with open(STATE_FILE, 'r') as f:
+        value = json.load(f).get('last_full_retrain')
+    return date.fromisoformat(value) if value else None
+
+
+def record_full_retrain(when=None):
+    with open(STATE_FILE, 'w') as f:
+        json.dump({'last_full_retrain': (when or date.today()).isoformat()}, f, indent=2)
+
+
+# ==================== LIVE PREDICTIONS ====================
+
+def load_predictions():
+    """Live predictions from the trade log, one per ticker per day (latest run wins)."""
+    if not os.path.exists(LOG_FILE):
+        return pd.DataFrame(columns=['date', 'ticker', 'confidence'])
+    with open(LOG_FILE, 'r') as f:
+        log = json.load(f)
+
+    rows = []
+    for entry in log:
+        for trade in entry.get('trades', []):
+            # No model prediction behind these: nothing to score
+            if trade.get('confidence') is None or trade.get('action') == 'SKIP (no signal)':
+                continue
+            rows.append({
+                'date': pd.Timestamp(trade.get('timestamp', entry['run_time'])).normalize(),
+                'ticker': trade['ticker'],
+                'confidence': float(trade['confidence'])
+            })
+
+    preds = pd.DataFrame(rows, columns=['date', 'ticker', 'confidence'])
+    return preds.drop_duplicates(subset=['date', 'ticker'], keep='last')
+
+
+def resolve_outcomes(ticker, preds):
+    """Attach the realized next-bar outcome to each prediction; drop unresolved ones."""
+    close = pd.read_csv(f'data/{ticker}.csv', parse_dates=[0], index_col=0)['Close']
+    next_up = (close.pct_change().shift(-1) > TARGET_THRESHOLD).to_numpy()
+
+    # Bar the prediction was made from: last close on or before the run date
+    pos = close.index.searchsorted(preds['date'].to_numpy(), side='right') - 1
+    resolved = (pos >= 0) & (pos < len(close) - 1)
+
+    preds = preds[resolved].copy()
+    preds['outcome'] = next_up[pos[resolved]].astype(int)
+    return preds
+
+
+def train_base_rate(ticker):
+    """Share of UP targets in the training period of the feature file."""
+    target = pd.read_csv(f'data/{ticker}_features.csv', usecols=['target'])['target']
+    target = target.iloc[:-1]    # last row's target is unknown
+    return float(target.iloc[:int(len(target) * TRAIN_FRAC)].mean())
+
+
+# ==================== DRIFT CHECK ====================
+
+def check_drift(ticker, predictions=None):
+    """Return live accuracy / Brier score for a ticker and whether it has drifted."""
+    if predictions is None:
+        predictions = load_predictions()
+    preds = predictions[predictions['ticker'] == ticker].sort_values('date')
+    preds = resolve_outcomes(ticker, preds).tail(DRIFT_WINDOW)
+
+    n = len(preds)
+    report = {'ticker': ticker, 'resolved': n, 'drift': False}
+    if n < MIN_RESOLVED:
+        return report
+
+    conf = preds['confidence'].to_numpy()
+    outcome = preds['outcome'].to_numpy()
+    base_rate = train_base_rate(ticker)
+
+    accuracy = ((conf >= 0.5) == outcome).mean()
+    acc_z = (accuracy - 0.5) / np.sqrt(0.25 / n)
+
+    # Paired per-prediction difference: model error minus base-rate error
+    diff = (conf - outcome) ** 2 - (base_rate - outcome) ** 2
+    diff_se = diff.std(ddof=1) / np.sqrt(n)
+    brier_t = diff.mean() / diff_se if diff_se > 0 else 0.0
+
+    report['accuracy'] = float(accuracy)
+    report['brier'] = float(np.mean((conf - outcome) ** 2))
+    report['baseline_brier'] = float(np.mean((base_rate - outcome) ** 2))
+    report['drift'] = bool(acc_z < -Z_CRITICAL or brier_t > Z_CRITICAL)
+    return report
+
+
+def needs_full_retrain(tickers=tickers):
+    """True if a model is missing or capped, or live predictions have drifted
+    and the last full rebuild is at least MIN_DAYS_BETWEEN_FULL days old."""
+    predictions = load_predictions()
+    structural = False
+    drift = False
+
+    for ticker in tickers:
+        model_path = f'models/{ticker}.pkl'
+        if not os.path.exists(model_path):
+            print(f"{ticker}: no model found")
+            structural = True
+            continue
+        if at_capacity(joblib.load(model_path)):
+            print(f"{ticker}: model at its size cap")
+            structural = True
+
+        r = check_drift(ticker, predictions)
+        if 'accuracy' in r:
+            print(f"{ticker}: {r['resolved']} resolved | "
+                  f"accuracy {r['accuracy']:.2f} | "
+                  f"Brier {r['brier']:.3f} (base rate {r['baseline_brier']:.3f})"
+                  f"{' | DRIFT' if r['drift'] else ''}")
+        else:
+            print(f"{ticker}: only {r['resolved']} resolved predictions, no verdict")
+        drift = drift or r['drift']
+
+    if structural:
+        return True
+    if not drift:
+        return False
+
+    last = last_full_retrain()
+    if last is not None and (date.today() - last).days < MIN_DAYS_BETWEEN_FULL:
+        print(f"Drift detected, but last full retrain was {last} "
+              f"(< {MIN_DAYS_BETWEEN_FULL} days ago); updating incrementally")
+        return False
+    return True
+
+
+if __name__ == '__main__':
+    if needs_full_retrain():
+        print("\n>>> Full retrain recommended")
+    else:
+        print("\n>>> Incremental update is enough")
@@ -0,0 +1,167 @@
+"""
+Feature registry.
+
+Every indicator is registered with the columns it is computed from and the
+extra bars of history it needs (its window). From that the registry can work
+out, for any set of model features:
+  - the minimal set of columns to compute (intermediates included), and
+  - the minimum history to fetch for the latest row to be complete.
+
+So a model pruned to a handful of features downloads and computes only what
+those features need. Registration order is the column order of the training
+feature files and is always a valid computation order.
+
+EWMs have no finite window; they are given 2 spans of warm-up, after which
+the truncated history carries under 2% of the weight.
+"""
+
+import numpy as np
+import pandas as pd
+
+RAW_COLUMNS = ['Date', 'Open', 'High', 'Low', 'Close', 'Volume', 'realized_vol']
+
+# name -> {'inputs': [...], 'window': bars, 'fn': fn(df, bars_per_year)}
+FEATURES = {}
+
+
+def feature(name, inputs, window, fn):
+    FEATURES[name] = {'inputs': inputs, 'window': window, 'fn': fn}
+
+
+# ==================== RETURNS ====================
+feature('return_cc', ['Close'], 1, lambda df, p: df['Close'].pct_change())
+feature('return_oc', ['Open', 'Close'], 0,
+        lambda df, p: (df['Close'] - df['Open']) / df['Open'])
+feature('overnight_gap', ['Open', 'Close'], 1,
+        lambda df, p: (df['Open'] - df['Close'].shift(1)) / df['Close'].shift(1))
+feature('upside', ['High', 'Close'], 1,
+        lambda df, p: (df['High'] - df['Close'].shift(1)) / df['Close'].shift(1))
+feature('downside', ['Low', 'Close'], 1,
+        lambda df, p: (df['Low'] - df['Close'].shift(1)) / df['Close'].shift(1))
+
+# ==================== MOVING AVERAGES ====================
+feature('ma_10', ['Close'], 9, lambda df, p: df['Close'].rolling(window=10).mean())
+feature('ma_50', ['Close'], 49, lambda df, p: df['Close'].rolling(window=50).mean())
+feature('price_vs_ma10', ['Close', 'ma_10'], 0,
+        lambda df, p: (df['Close'] - df['ma_10']) / df['ma_10'])
+feature('price_vs_ma50', ['Close', 'ma_50'], 0,
+        lambda df, p: (df['Close'] - df['ma_50']) / df['ma_50'])
+feature('ma_diff', ['ma_10', 'ma_50'], 0,
+        lambda df, p: (df['ma_10'] - df['ma_50']) / df['ma_50'])
+feature('ma_10_slope', ['ma_10'], 5, lambda df, p: df['ma_10'].pct_change(5))
+feature('ma_50_slope', ['ma_50'], 5, lambda df, p: df['ma_50'].pct_change(5))
+
+# ==================== VOLATILITY ====================
+feature('volatility_10', ['return_cc'], 9,
+        lambda df, p: df['return_cc'].rolling(window=10).std())
+feature('volatility_50', ['return_cc'], 49,
+        lambda df, p: df['return_cc'].rolling(window=50).std())
+feature('vol_ratio', ['volatility_10', 'volatility_50'], 0,
+        lambda df, p: df['volatility_10'] / df['volatility_50'])
+feature('volatility_annual', ['volatility_10'], 0,
+        lambda df, p: df['volatility_10'] * (p ** 0.5))
+feature('parkinson_vol', ['High', 'Low'], 9, lambda df, p: np.sqrt(
+    (1 / (4 * np.log(2))) * (np.log(df['High'] / df['Low']) ** 2)
+).rolling(window=10).mean())
+# Only available when daily bars are built from intraday data (bars.py)
+feature('realized_vol_10', ['realized_vol'], 9,
+        lambda df, p: df['realized_vol'].rolling(window=10).mean())
+feature('vol_change', ['volatility_10'], 5, lambda df, p: df['volatility_10'].pct_change(5))
+
+# ==================== HIGH-LOW FEATURES ====================
+feature('intraday_range', ['High', 'Low', 'Close'], 0,
+        lambda df, p: (df['High'] - df['Low']) / df['Close'])
+feature('close_position', ['High', 'Low', 'Close'], 0,
+        lambda df, p: (df['Close'] - df['Low']) / (df['High'] - df['Low']))
+
+
+# ==================== RSI ====================
+def _rsi(df, p):
+    delta = df['Close'].diff()
+    gain = delta.where(delta > 0, 0).rolling(14).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(14).mean()
+    return 100 - (100 / (1 + gain / loss))
+
+
+feature('rsi', ['Close'], 14, _rsi)
+
+# ==================== MACD ====================
+feature('ema_12', ['Close'], 24, lambda df, p: df['Close'].ewm(span=12).mean())
+feature('ema_26', ['Close'], 52, lambda df, p: df['Close'].ewm(span=26).mean())
+feature('macd', ['ema_12', 'ema_26'], 0, lambda df, p: df['ema_12'] - df['ema_26'])
+feature('macd_signal', ['macd'], 18, lambda df, p: df['macd'].ewm(span=9).mean())
+feature('macd_hist', ['macd', 'macd_signal'], 0,
+        lambda df, p: df['macd'] - df['macd_signal'])
+# Normalize MACD by price so it's comparable across stocks
+feature('macd_norm', ['macd', 'Close'], 0, lambda df, p: df['macd'] / df['Close'])
+feature('macd_signal_norm', ['macd_signal', 'Close'], 0,
+        lambda df, p: df['macd_signal'] / df['Close'])
+feature('macd_hist_norm', ['macd_hist', 'Close'], 0,
+        lambda df, p: df['macd_hist'] / df['Close'])
+
+# ==================== VOLUME FEATURES ====================
+feature('volume_ma_10', ['Volume'], 9, lambda df, p: df['Volume'].rolling(10).mean())
+feature('volume_ma_50', ['Volume'], 49, lambda df, p: df['Volume'].rolling(50).mean())
+feature('volume_ratio', ['Volume', 'volume_ma_10'], 0,
+        lambda df, p: df['Volume'] / df['volume_ma_10'])
+feature('volume_trend', ['volume_ma_10', 'volume_ma_50'], 0,
+        lambda df, p: df['volume_ma_10'] / df['volume_ma_50'])
+# Price-volume relationship
+feature('price_volume', ['return_cc', 'volume_ratio'], 0,
+        lambda df, p: df['return_cc'] * df['volume_ratio'])
+
+# ==================== DAY OF WEEK ====================
+feature('day_of_week', ['Date'], 0, lambda df, p: pd.to_datetime(df['Date']).dt.dayofweek)
+
+# Computed only as inputs to other features, never kept in feature files
+INTERMEDIATES = ['ema_12', 'ema_26', 'macd', 'macd_signal', 'macd_hist']
+
+
+# ==================== RESOLUTION ====================
+
+def resolve(names):
+    """Every registered feature needed to compute names, in computation order."""
+    needed = set()
+    stack = list(names)
+    while stack:
+        name = stack.pop()
+        if name in needed or name in RAW_COLUMNS:
+            continue
+        if name not in FEATURES:
+            raise KeyError(f"Unknown feature: {name}")
+        needed.add(name)
+        stack.extend(FEATURES[name]['inputs'])
+    return [name for name in FEATURES if name in needed]
+
+
+def lookback(names):
+    """Bars of history before the latest row needed to compute names."""
+    bars = {}
+    for name in resolve(names):
+        spec = FEATURES[name]
+        bars[name] = max((bars.get(i, 0) for i in spec['inputs']), default=0) + spec['window']
+    return max((bars[n] for n in names if n in bars), default=0)
+
+
+def history_days(names, buffer_days=10):
+    """Calendar days of daily bars to download for names (weekends + holidays)."""
+    rows = lookback(names) + 1
+    return int(rows * 365 / 252) + buffer_days
+
+
+def default_features(columns):
+    """All features computable from the raw columns present.
+
+    Realized volatility replaces the Parkinson estimator when it's available.
+    """
+    skip = 'parkinson_vol' if 'realized_vol' in columns else 'realized_vol_10'
+    return [name for name in FEATURES if name != skip]
+
+
+def compute_features(df, names=None, bars_per_year=252):
+    """Add the features in names, plus whatever they depend on, to df."""
+    if names is None:
+        names = default_features(df.columns)
+    for name in resolve(names):
+        df[name] = FEATURES[name]['fn'](df, bars_per_year)
+    return df
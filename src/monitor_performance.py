@@ -6,6 +6,7 @@ import json
 import pandas as pd
 from config import api
 from datetime import datetime
+from order_book import OrderBook, FILLS_FILE
 
 LOG_FILE = 'data/trade_log.json'
 
@@ -91,15 +92,28 @@ def monitor():
         print(f"First run: {values[0]['date']}")
         print(f"Latest run: {values[-1]['date']}")
 
-    # --- Closed Orders from Alpaca ---
-    orders = api.list_orders(status='closed', limit=20)
+    # --- Closed Orders from the local order book ---
+    book = OrderBook(api)
+    book.reconcile()
+    orders = book.closed_orders()
     if orders:
-        print(f"\n--- Recent Closed Orders (last 20) ---")
-        for o in orders:
-            price = f"${float(o.filled_avg_price):.2f}" if o.filled_avg_price else "pending"
-            print(f"{str(o.submitted_at)[:10]} | {o.side.upper()} {o.symbol} | "
-                  f"{o.qty} shares @ {price} | "
-                  f"Status: {o.status}")
+        print(f"\n--- Closed Orders ({len(orders)} total, last 20) ---")
+        for o in orders[-20:]:
+            price = f"${float(o['filled_avg_price']):.2f}" if o.get('filled_avg_price') else "pending"
+            print(f"{str(o['submitted_at'])[:10]} | {o['side'].upper()} {o['symbol']} | "
+                  f"{o['qty']} shares @ {price} | "
+                  f"Status: {o['status']}")
+
+    # --- Fill Quality ---
+    if os.path.exists(FILLS_FILE):
+        fills = pd.read_csv(FILLS_FILE)
+        print(f"\n--- Fill Quality ({len(fills)} fills) ---")
+        print(f"Median submit-to-fill: {fills['latency_sec'].median():,.1f}s")
+        print(f"95th pct submit-to-fill: {fills['latency_sec'].quantile(0.95):,.1f}s")
+        slippage = fills['slippage_bps'].dropna()
+        if not slippage.empty:
+            print(f"Avg slippage vs sizing price: {slippage.mean():+.1f} bps "
+                  f"({len(slippage)} fills with a reference price)")
 
     # --- Equity Curve Chart ---
     if len(values) >= 2:
@@ -0,0 +1,232 @@
+"""
+Local order & position book.
+
+Keeps a copy of orders and positions so trading code reads them locally
+instead of polling the broker. The book is:
+  - reconciled against the REST API on startup (open orders, positions,
+    final state of orders that were open last time, closed orders since
+    the last sync)
+  - kept current by Alpaca's trade_updates stream while the process runs
+  - persisted to data/order_book.json, so fills that happen while the bot
+    is offline are picked up at the next reconcile
+
+Every order submitted through the book remembers the price it was sized
+from. When it fills, submit-to-fill latency and slippage against that price
+are appended to data/fills.csv.
+"""
+
+import os
+import csv
+import json
+import threading
+from datetime import datetime, timezone
+import pandas as pd
+
+BOOK_FILE = 'data/order_book.json'
+FILLS_FILE = 'data/fills.csv'
+
+TERMINAL = {'filled', 'canceled', 'expired', 'rejected', 'replaced', 'done_for_day'}
+ORDER_FIELDS = ['id', 'symbol', 'side', 'qty', 'filled_qty', 'filled_avg_price',
+                'status', 'submitted_at', 'filled_at']
+FILL_FIELDS = ['order_id', 'symbol', 'side', 'qty', 'submitted_at', 'filled_at',
+               'latency_sec', 'ref_price', 'fill_price', 'slippage_bps']
+
+
+def _raw(entity):
+    """Plain dict from an alpaca Entity (or a dict already)."""
+    return entity if isinstance(entity, dict) else entity._raw
+
+
+class OrderBook:
+    def __init__(self, api, path=BOOK_FILE, fills_file=FILLS_FILE):
+        self.api = api
+        self.path = path
+        self.fills_file = fills_file
+        self.orders = {}
+        self.positions = {}
+        self.last_sync = None
+        self._lock = threading.RLock()
+        self._stream = None
+        self.load()
+
+    # ==================== PERSISTENCE ====================
+
+    def load(self):
+        if os.path.exists(self.path):
+            with open(self.path, 'r') as f:
+                state = json.load(f)
+            self.orders = state.get('orders', {})
+            self.positions = state.get('positions', {})
+            self.last_sync = state.get('last_sync')
+
+    def save(self):
+        with self._lock:
+            state = {'last_sync': self.last_sync, 'orders': self.orders,
+                     'positions': self.positions}
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            tmp_path = f'{self.path}.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump(state, f, indent=2, default=str)
+            os.replace(tmp_path, self.path)
+
+    # ==================== SYNC ====================
+
+    def reconcile(self):
+        """Bring the book in line with the broker. Call once on startup."""
+        sync_time = datetime.now(timezone.utc).isoformat()
+        positions = {p.symbol: self._position_from_api(p) for p in self.api.list_positions()}
+        open_orders = self.api.list_orders(status='open', limit=500)
+
+        with self._lock:
+            self.positions = positions
+            for o in open_orders:
+                self._apply_order(_raw(o))
+            open_ids = {o.id for o in open_orders}
+            stale = [oid for oid, o in self.orders.items()
+                     if o.get('status') not in TERMINAL and oid not in open_ids]
+
+        # Tracked orders that closed while we weren't listening
+        for oid in stale:
+            self._apply_order(_raw(self.api.get_order(oid)))
+
+        # Closed orders submitted since the last sync, paged oldest first
+        after = self.last_sync
+        while True:
+            batch = self.api.list_orders(status='closed', after=after,
+                                         limit=500, direction='asc')
+            for o in batch:
+                self._apply_order(_raw(o))
+            if len(batch) < 500:
+                break
+            after = _raw(batch[-1])['submitted_at']
+
+        self.last_sync = sync_time
+        self.save()
+
+    def start_stream(self, key_id, secret_key, base_url):
+        """Follow trade_updates in a background thread for the life of the process."""
+        from alpaca_trade_api.stream import Stream
+
+        self._stream = Stream(key_id, secret_key, base_url=base_url)
+        self._stream.subscribe_trade_updates(self._on_trade_update)
+        threading.Thread(target=self._stream.run, daemon=True).start()
+
+    def stop_stream(self):
+        if self._stream is not None:
+            try:
+                self._stream.stop()
+            except Exception as e:
+                print(f"Could not stop trade stream cleanly: {e}")
+            self._stream = None
+        self.save()
+
+    async def _on_trade_update(self, data):
+        order = _raw(data.order)
+        with self._lock:
+            self._apply_order(order)
+            if data.event in ('fill', 'partial_fill'):
+                self._apply_fill(order['symbol'], order['side'], float(data.qty),
+                                 float(data.price), float(data.position_qty))
+        self.save()
+
+    # ==================== UPDATES ====================
+
+    def _apply_order(self, raw):
+        with self._lock:
+            order = self.orders.setdefault(raw['id'], {})
+            for field in ORDER_FIELDS:
+                if raw.get(field) is not None:
+                    order[field] = raw[field]
+            if order.get('status') == 'filled' and not order.get('fill_logged'):
+                self._log_fill(order)
+                order['fill_logged'] = True
+
+    def _apply_fill(self, symbol, side, fill_qty, price, position_qty):
+        pos = self.positions.get(symbol, {'qty': 0, 'entry_price': price})
+        if side == 'buy' and position_qty > 0:
+            held = position_qty - fill_qty
+            pos['entry_price'] = (held * pos['entry_price'] + fill_qty * price) / position_qty
+
+        if position_qty == 0:
+            self.positions.pop(symbol, None)
+            return
+        pos['qty'] = int(position_qty)
+        pos['current_price'] = price
+        pos['pnl_pct'] = price / pos['entry_price'] - 1
+        self.positions[symbol] = pos
+
+    def _log_fill(self, order):
+        submitted = pd.Timestamp(order['submitted_at'])
+        filled = pd.Timestamp(order['filled_at'])
+        fill_price = float(order['filled_avg_price'])
+        ref_price = order.get('ref_price')
+
+        slippage_bps = ''
+        if ref_price:
+            sign = 1 if order['side'] == 'buy' else -1
+            slippage_bps = round(sign * (fill_price - ref_price) / ref_price * 1e4, 2)
+
+        new_file = not os.path.exists(self.fills_file)
+        with open(self.fills_file, 'a', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=FILL_FIELDS)
+            if new_file:
+                writer.writeheader()
+            writer.writerow({
+                'order_id': order['id'],
+                'symbol': order['symbol'],
+                'side': order['side'],
+                'qty': order.get('filled_qty', order['qty']),
+                'submitted_at': order['submitted_at'],
+                'filled_at': order['filled_at'],
+                'latency_sec': round((filled - submitted).total_seconds(), 3),
+                'ref_price': ref_price if ref_price else '',
+                'fill_price': fill_price,
+                'slippage_bps': slippage_bps
+            })
+
+    # ==================== ORDERS ====================
+
+    def submit_order(self, symbol, qty, side, ref_price=None):
+        """Submit a market order and remember the price it was sized from."""
+        # Hold the lock across the submit so a fast fill event from the
+        # stream can't be logged before ref_price is recorded
+        with self._lock:
+            order = self.api.submit_order(symbol=symbol, qty=qty, side=side,
+                                          type='market', time_in_force='gtc')
+            self.orders.setdefault(order.id, {})['ref_price'] = ref_price or None
+            self._apply_order(_raw(order))
+        self.save()
+        return order
+
+    def cancel_order(self, order_id):
+        self.api.cancel_order(order_id)
+        with self._lock:
+            self.orders.setdefault(order_id, {})['status'] = 'pending_cancel'
+
+    # ==================== LOCAL READS ====================
+
+    def open_orders(self):
+        with self._lock:
+            return [dict(o) for o in self.orders.values()
+                    if o.get('status') not in TERMINAL | {'pending_cancel'}]
+
+    def pending_symbols(self):
+        return {o['symbol'] for o in self.open_orders()}
+
+    def closed_orders(self):
+        with self._lock:
+            closed = [dict(o) for o in self.orders.values() if o.get('status') in TERMINAL]
+        return sorted(closed, key=lambda o: str(o.get('submitted_at')))
+
+    def get_positions(self):
+        with self._lock:
+            return {symbol: dict(p) for symbol, p in self.positions.items()}
+
+    @staticmethod
+    def _position_from_api(p):
+        return {
+            'qty': int(p.qty),
+            'entry_price': float(p.avg_entry_price),
+            'current_price': float(p.current_price),
+            'pnl_pct': float(p.unrealized_plpc)
+        }
@@ -1,15 +1,27 @@
 """
 RETRAIN SCRIPT
-Run this once a month to refresh models with latest data.
-Do NOT run more often — that causes overfitting.
+Refresh models with latest data.
 
-Usage: python src/retrain.py
+By default the drift monitor decides how much work to do:
+  - live predictions still healthy -> incremental update (update_model.py):
+    new trees/stages on the newest bars, promoted only if they beat the
+    current model on a recent holdout
+  - significant drift, at most once every 30 days, or a model missing or at
+    its size cap -> full rebuild (train_model.py)
+
+Safe to run more often than monthly: the drift monitor rate-limits full
+rebuilds. A full rebuild can be forced with --full; do NOT force it more
+than once a month — that causes overfitting.
+
+Usage: python src/retrain.py [--full]
 """
 
 import subprocess
 import sys
 from datetime import datetime
 
+from drift_monitor import needs_full_retrain, record_full_retrain
+
 print("=" * 50)
 print(f"MODEL RETRAIN: {datetime.now().strftime('%Y-%m-%d %H:%M')}")
 print("=" * 50)
@@ -32,14 +44,29 @@ if result.returncode != 0:
     print(f"ERROR: {result.stderr}")
     sys.exit(1)
 
-# Step 3: Retrain models
-print("\n--- Step 3: Training models ---")
-result = subprocess.run([sys.executable, 'src/train_model.py'],
+# Step 3: Check live predictions for drift
+print("\n--- Step 3: Checking model drift ---")
+full = '--full' in sys.argv
+if full:
+    print("Full retrain forced (--full)")
+else:
+    full = needs_full_retrain()
+
+# Step 4: Retrain or update models
+if full:
+    print("\n--- Step 4: Training models (full) ---")
+    script = 'src/train_model.py'
+else:
+    print("\n--- Step 4: Updating models (incremental) ---")
+    script = 'src/update_model.py'
+result = subprocess.run([sys.executable, script],
                         capture_output=True, text=True)
 print(result.stdout)
 if result.returncode != 0:
     print(f"ERROR: {result.stderr}")
     sys.exit(1)
+if full:
+    record_full_retrain()
 
 print("\n" + "=" * 50)
 print("RETRAIN COMPLETE")
@@ -0,0 +1,199 @@
+"""
+MULTI-STRATEGY RUNNER
+Runs every strategy in config.STRATEGIES side by side in one process.
+
+Market data is downloaded once for all tickers, and features are computed
+once per ticker for the union of features every strategy's models need.
+Each strategy then scores its own models, applies its own thresholds and
+trades its own account, concurrently with the others.
+
+Each strategy writes to data/strategies/{name}/ (trade log, order book,
+fills); every trade log entry includes per-stage timings.
+
+Usage: python src/run_multi.py
+"""
+
+import sys
+import os
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__))))
+
+import joblib
+import yfinance as yf
+from alpaca_trade_api import REST
+
+import config
+from execute_trades import default_strategy, execute_trades
+from features import compute_features, history_days
+from generate_signals import model_features, to_signal
+
+CREDENTIAL_KEYS = ('api_key', 'secret_key', 'base_url')
+
+
+# ==================== STRATEGIES ====================
+
+def load_strategies():
+    """Build strategy dicts from config.STRATEGIES and load their models.
+
+    Strategies pointing at the same model_dir share the loaded model objects.
+    """
+    model_cache = {}
+    strategies = []
+
+    for overrides in getattr(config, 'STRATEGIES', [{'name': 'default'}]):
+        strategy = default_strategy()
+        strategy.update(overrides)
+        if 'data_dir' not in overrides:
+            strategy['data_dir'] = f"data/strategies/{strategy['name']}"
+        if any(k in overrides for k in CREDENTIAL_KEYS):
+            strategy['api'] = REST(strategy['api_key'], strategy['secret_key'],
+                                   strategy['base_url'], api_version='v2')
+        os.makedirs(strategy['data_dir'], exist_ok=True)
+
+        strategy['models'] = {}
+        for ticker in strategy['tickers']:
+            path = f"{strategy['model_dir']}/{ticker}.pkl"
+            try:
+                if path not in model_cache:
+                    model_cache[path] = joblib.load(path)
+                strategy['models'][ticker] = model_cache[path]
+            except Exception as e:
+                print(f"[{strategy['name']}] Could not load {path}: {e}")
+
+        strategies.append(strategy)
+
+    return strategies
+
+
+# ==================== SHARED DATA & FEATURES ====================
+
+def build_shared_features(strategies):
+    """One download for every ticker, one feature pass per ticker.
+
+    Each ticker gets the union of the features its models (across all
+    strategies) use, and enough history for the longest of them.
+    """
+    needed = {}
+    for strategy in strategies:
+        for ticker, model in strategy['models'].items():
+            needed.setdefault(ticker, set()).update(model_features(model))
+    if not needed:
+        return {}, {}
+
+    timing = {}
+    start = time.perf_counter()
+    days = max(history_days(cols) for cols in needed.values())
+    since = (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d')
+    data = yf.download(list(needed), start=since, group_by='ticker', progress=False)
+    timing['download_s'] = round(time.perf_counter() - start, 3)
+
+    features = {}
+    start = time.perf_counter()
+    for ticker, cols in needed.items():
+        try:
+            df = data[ticker].dropna(how='all').reset_index()
+            df.columns.name = None
+            compute_features(df, list(cols))
+            df.dropna(inplace=True)
+            features[ticker] = df
+        except Exception as e:
+            print(f"Could not build features for {ticker}: {e}")
+    timing['features_s'] = round(time.perf_counter() - start, 3)
+
+    return features, timing
+
+
+# ==================== PER-STRATEGY RUN ====================
+
+def append_log(path, entry):
+    log = []
+    if os.path.exists(path):
+        with open(path, 'r') as f:
+            log = json.load(f)
+    log.append(entry)
+    with open(path, 'w') as f:
+        json.dump(log, f, indent=2)
+
+
+def run_strategy(strategy, features, shared_timing):
+    name = strategy['name']
+    timing = dict(shared_timing)
+    start = time.perf_counter()
+
+    try:
+        signals, confidences = {}, {}
+        for ticker, model in strategy['models'].items():
+            if ticker not in features:
+                continue
+            latest = features[ticker][model_features(model)].iloc[[-1]]
+            probability = model.predict_proba(latest)[0]
+            signals[ticker] = to_signal(probability, strategy['buy_threshold'])
+            confidences[ticker] = probability[1]
+        timing['predict_s'] = round(time.perf_counter() - start, 3)
+
+        step = time.perf_counter()
+        account = strategy['api'].get_account()
+        trades = execute_trades(signals, strategy, confidences)
+        timing['execute_s'] = round(time.perf_counter() - step, 3)
+    except Exception as e:
+        print(f"[{name}] Run failed: {e}")
+        timing['error'] = str(e)
+        return name, timing
+
+    timing['strategy_total_s'] = round(time.perf_counter() - start, 3)
+    log_file = f"{strategy['data_dir']}/trade_log.json"
+    append_log(log_file, {
+        'run_time': datetime.now().isoformat(),
+        'strategy': name,
+        'cash': account.cash,
+        'portfolio_value': account.portfolio_value,
+        'signals': signals,
+        'trades': trades,
+        'timing': timing
+    })
+    print(f"[{name}] Log saved to {log_file}")
+    return name, timing
+
+
+def run():
+    if datetime.now().weekday() >= 5:
+        print("Weekend — skipping")
+        return
+
+    print("=" * 50)
+    print(f"MULTI-STRATEGY RUN: {datetime.now().strftime('%Y-%m-%d %H:%M')}")
+    print("=" * 50)
+
+    start = time.perf_counter()
+    strategies = load_strategies()
+    load_s = round(time.perf_counter() - start, 3)
+    print(f"\nStrategies: {[s['name'] for s in strategies]}")
+
+    print("\n--- Shared data & features ---")
+    features, shared_timing = build_shared_features(strategies)
+    shared_timing['load_models_s'] = load_s
+    print(f"Features for {len(features)} tickers: {shared_timing}")
+
+    print("\n--- Running strategies ---")
+    with ThreadPoolExecutor(max_workers=max(len(strategies), 1)) as pool:
+        results = list(pool.map(
+            lambda s: run_strategy(s, features, shared_timing), strategies))
+
+    print("\n--- Timing (seconds) ---")
+    for name, timing in results:
+        print(f"{name:<20} predict {timing.get('predict_s', '-')} | "
+              f"execute {timing.get('execute_s', '-')} | "
+              f"total {timing.get('strategy_total_s', '-')}"
+              f"{' | ERROR: ' + timing['error'] if 'error' in timing else ''}")
+    print(f"Wall clock: {time.perf_counter() - start:.2f}s")
+    print("=" * 50)
+    print("DONE")
+
+
+if __name__ == '__main__':
+    run()
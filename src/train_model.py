@@ -1,65 +1,83 @@
+import argparse
 import pandas as pd
 import joblib
 from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
 from sklearn.metrics import accuracy_score, classification_report
 
+from build_features import feature_path
+from cv import cross_validate_models, summarize_folds
+
 tickers = ['AAPL', 'MSFT', 'GOOGL', 'AMZN', 'NVDA']
 
 # Columns the model should NOT use as features
 drop_cols = ['Date', 'Open', 'High', 'Low', 'Close', 'Volume',
              'ma_10', 'ma_50', 'volume_ma_10', 'volume_ma_50', 'target']
 
-for ticker in tickers:
+HORIZON = 1      # target looks this many bars ahead
+CV_FOLDS = 5
+
+
+def make_candidates():
+    return {
+        'Random Forest': RandomForestClassifier(
+            n_estimators=200,
+            max_depth=10,
+            min_samples_leaf=20,
+            class_weight='balanced',
+            random_state=42
+        ),
+        'Gradient Boosting': GradientBoostingClassifier(
+            n_estimators=200,
+            max_depth=5,
+            learning_rate=0.05,
+            min_samples_leaf=20,
+            random_state=42
+        )
+    }
+
+
+def train_ticker(ticker, interval=None):
+    """Train on the daily feature file, or the --interval one if given.
+
+    Interval models are saved as models/{ticker}_{interval}.pkl so the daily
+    models used for live trading are left alone.
+    """
+    name = f'{ticker}_{interval}' if interval else ticker
     print(f"{'='*50}")
-    print(f"--- {ticker} ---")
+    print(f"--- {name} ---")
     print(f"{'='*50}")
-    df = pd.read_csv(f'data/{ticker}_features.csv')
+    df = pd.read_csv(feature_path(ticker, interval))
+    # The last row's target looks at a bar that doesn't exist yet
+    df = df.iloc[:-HORIZON]
 
     # Separate features and target
     feature_cols = [c for c in df.columns if c not in drop_cols]
     X = df[feature_cols]
     y = df['target']
 
-    # Time-based split (80% train, 20% test) — no shuffling
+    # Time-based split (80% train, 20% test) — no shuffling.
+    # Purge the last HORIZON train rows: their targets fall in the test period.
     split = int(len(df) * 0.8)
-    X_train, X_test = X[:split], X[split:]
-    y_train, y_test = y[:split], y[split:]
-
-    # --- Train Random Forest ---
-    rf_model = RandomForestClassifier(
-        n_estimators=200,
-        max_depth=10,
-        min_samples_leaf=20,
-        class_weight='balanced',
-        random_state=42
-    )
-    rf_model.fit(X_train, y_train)
-    rf_acc = accuracy_score(y_test, rf_model.predict(X_test))
-
-    # --- Train Gradient Boosting ---
-    gb_model = GradientBoostingClassifier(
-        n_estimators=200,
-        max_depth=5,
-        learning_rate=0.05,
-        min_samples_leaf=20,
-        random_state=42
-    )
-    gb_model.fit(X_train, y_train)
-    gb_acc = accuracy_score(y_test, gb_model.predict(X_test))
-
-    # --- Pick the best ---
-    if gb_acc > rf_acc:
-        best_model = gb_model
-        best_name = 'Gradient Boosting'
-        best_acc = gb_acc
-    else:
-        best_model = rf_model
-        best_name = 'Random Forest'
-        best_acc = rf_acc
-
-    print(f"\nRandom Forest accuracy:    {rf_acc:.4f}")
-    print(f"Gradient Boosting accuracy: {gb_acc:.4f}")
-    print(f">>> Using: {best_name} ({best_acc:.4f})\n")
+    X_train, X_test = X[:split - HORIZON], X[split:]
+    y_train, y_test = y[:split - HORIZON], y[split:]
+
+    # --- Model selection: purged walk-forward CV on the training period ---
+    candidates = make_candidates()
+    metrics = cross_validate_models(candidates, X_train.to_numpy(), y_train.to_numpy(),
+                                    n_splits=CV_FOLDS, horizon=HORIZON)
+    metrics.insert(0, 'ticker', ticker)
+    metrics.to_csv(f'data/{name}_cv_metrics.csv', index=False)
+
+    summary = summarize_folds(metrics)
+    print("\nCV accuracy by model:")
+    for model_name, row in summary.iterrows():
+        print(f"{model_name:<18} mean {row['mean']:.4f} ± {row['std']:.4f} "
+              f"(worst fold {row['min']:.4f})")
+
+    best_name = summary.index[0]
+    best_model = candidates[best_name].fit(X_train, y_train)
+    best_acc = accuracy_score(y_test, best_model.predict(X_test))
+    print(f">>> Using: {best_name} (holdout accuracy {best_acc:.4f})\n")
 
     # Evaluate best model
     y_pred = best_model.predict(X_test)
@@ -70,6 +88,20 @@ for ticker in tickers:
     print("Top 10 features:")
     print(importances.sort_values(ascending=False).head(10))
 
-    # Save best model
-    joblib.dump(best_model, f'models/{ticker}.pkl')
-    print(f"\nSaved models/{ticker}.pkl ({best_name})\n")
+    # Save best model, with the last bar it has seen (update_model.py only
+    # scores it on bars after this)
+    best_model.fitted_through_ = str(df['Date'].iloc[split - HORIZON - 1])
+    joblib.dump(best_model, f'models/{name}.pkl')
+    print(f"\nSaved models/{name}.pkl ({best_name})")
+    print(f"Saved data/{name}_cv_metrics.csv\n")
+    return best_model
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Train models per stock.')
+    parser.add_argument('--interval', help='train on features built with '
+                        'build_features.py --interval (e.g. 5m, 1h, 1d)')
+    args = parser.parse_args()
+
+    for ticker in tickers:
+        train_ticker(ticker, args.interval)
@@ -0,0 +1,163 @@
+"""
+STREAMING TRAINER
+Out-of-core alternative to train_model.py for long histories (minute bars,
+hundreds of symbols). Feature files are read in fixed-size chunks through a
+generator pipeline and fed to partial-fit learners, so peak memory depends on
+CHUNK_ROWS, not on the length of the file.
+
+The time-ordered 80/20 split is kept, purged the same way as train_model.py:
+rows are never shuffled and the split index is found with a cheap counting
+pass over the target column.
+
+With --interval, trains on data/{ticker}_{interval}_features.csv (see
+build_features.py) and saves to models/{ticker}_{interval}.pkl, so the daily
+models used for live trading are left alone.
+
+Usage: python src/train_stream.py [--interval 5m] [TICKER ...]
+"""
+
+import argparse
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import SGDClassifier
+from sklearn.metrics import confusion_matrix
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+from build_features import feature_path
+
+tickers = ['AAPL', 'MSFT', 'GOOGL', 'AMZN', 'NVDA']
+
+# Columns the model should NOT use as features (same as train_model.py)
+drop_cols = ['Date', 'Open', 'High', 'Low', 'Close', 'Volume',
+             'ma_10', 'ma_50', 'volume_ma_10', 'volume_ma_50', 'target']
+
+CHUNK_ROWS = 50_000    # rows held in memory at once
+TRAIN_FRAC = 0.8       # time-based split, same as train_model.py
+HORIZON = 1            # target looks this many bars ahead
+N_EPOCHS = 5           # passes over the training rows
+
+
+# ==================== CHUNK PIPELINE ====================
+
+def get_feature_cols(path):
+    """Read only the header and return the model's feature columns."""
+    header = pd.read_csv(path, nrows=0).columns
+    return [c for c in header if c not in drop_cols]
+
+
+def count_rows(path, split_frac=TRAIN_FRAC, chunksize=CHUNK_ROWS):
+    """Count rows and training-class frequencies without loading the file.
+
+    Same split as train_model.py: the last HORIZON rows are dropped (their
+    target looks at bars that don't exist yet) and the last HORIZON training
+    rows are purged, since their targets fall in the test period.
+    Returns (n_rows, train_end, split, class_counts): train on
+    [0, train_end), test on [split, n_rows).
+    """
+    n_rows = 0
+    for chunk in pd.read_csv(path, usecols=['target'], chunksize=chunksize):
+        n_rows += len(chunk)
+    n_rows = max(n_rows - HORIZON, 0)
+    split = int(n_rows * split_frac)
+    train_end = max(split - HORIZON, 0)
+
+    class_counts = np.zeros(2, dtype=np.int64)
+    for _, y in iter_xy(path, [], stop=train_end, chunksize=chunksize):
+        class_counts += np.bincount(y, minlength=2)[:2]
+
+    return n_rows, train_end, split, class_counts
+
+
+def iter_xy(path, feature_cols, start=0, stop=None, chunksize=CHUNK_ROWS):
+    """Yield (X, y) chunks for rows [start, stop) in file order."""
+    pos = 0
+    for chunk in pd.read_csv(path, usecols=feature_cols + ['target'],
+                             chunksize=chunksize):
+        lo, hi = pos, pos + len(chunk)
+        pos = hi
+        if hi <= start:
+            continue
+        if stop is not None and lo >= stop:
+            break
+
+        first = max(start - lo, 0)
+        last = len(chunk) if stop is None else min(stop - lo, len(chunk))
+        chunk = chunk.iloc[first:last]
+        if chunk.empty:
+            continue
+        yield chunk[feature_cols].astype(np.float32), chunk['target'].to_numpy()
+
+
+# ==================== TRAINING ====================
+
+def train_streaming(ticker, interval=None):
+    """Fit a scaler + SGD logistic model on a feature file, chunk by chunk."""
+    path = feature_path(ticker, interval)
+    feature_cols = get_feature_cols(path)
+    n_rows, train_end, split, class_counts = count_rows(path)
+    print(f"{ticker}: {n_rows} rows ({train_end} train / {n_rows - split} test)")
+
+    # 'balanced' weights can't be used with partial_fit, so compute them
+    # from the counting pass instead
+    class_weight = {c: train_end / (2 * max(class_counts[c], 1)) for c in (0, 1)}
+
+    # Pass 1: running mean / variance for scaling
+    scaler = StandardScaler()
+    for X, _ in iter_xy(path, feature_cols, stop=train_end):
+        scaler.partial_fit(X)
+
+    # Pass 2..N: SGD logistic regression on scaled chunks
+    clf = SGDClassifier(
+        loss='log_loss',
+        alpha=1e-4,
+        class_weight=class_weight,
+        random_state=42
+    )
+    for _ in range(N_EPOCHS):
+        for X, y in iter_xy(path, feature_cols, stop=train_end):
+            clf.partial_fit(scaler.transform(X), y, classes=[0, 1])
+
+    # Evaluate on the held-out tail, keeping only running counts
+    cm = np.zeros((2, 2), dtype=np.int64)
+    for X, y in iter_xy(path, feature_cols, start=split, stop=n_rows):
+        cm += confusion_matrix(y, clf.predict(scaler.transform(X)), labels=[0, 1])
+
+    accuracy = np.trace(cm) / max(cm.sum(), 1)
+    print(f"Test accuracy: {accuracy:.4f}")
+    for label, name in enumerate(['DOWN', 'UP']):
+        precision = cm[label, label] / max(cm[:, label].sum(), 1)
+        recall = cm[label, label] / max(cm[label, :].sum(), 1)
+        print(f"{name:>5}  precision: {precision:.2f}  recall: {recall:.2f}  "
+              f"support: {cm[label, :].sum()}")
+
+    # Largest absolute coefficients on the scaled features (top 10)
+    coefs = pd.Series(clf.coef_[0], index=feature_cols)
+    print("Top 10 features:")
+    print(coefs.abs().sort_values(ascending=False).head(10))
+
+    # Same predict/predict_proba interface as the in-memory models
+    model = Pipeline([('scaler', scaler), ('clf', clf)])
+    # Last bar the model has seen (update_model.py only scores it on bars after this)
+    if train_end > 0:
+        last_row = pd.read_csv(path, usecols=['Date'], skiprows=range(1, train_end), nrows=1)
+        model.fitted_through_ = str(last_row['Date'].iloc[0])
+    model_path = f'models/{ticker}_{interval}.pkl' if interval else f'models/{ticker}.pkl'
+    joblib.dump(model, model_path)
+    print(f"\nSaved {model_path} (Streaming SGD)\n")
+    return model
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Train models out-of-core.')
+    parser.add_argument('tickers', nargs='*', default=tickers)
+    parser.add_argument('--interval', help='train on features built with '
+                        'build_features.py --interval (e.g. 5m, 1h, 1d)')
+    args = parser.parse_args()
+
+    for ticker in args.tickers:
+        print(f"{'='*50}")
+        print(f"--- {ticker} ---")
+        print(f"{'='*50}")
+        train_streaming(ticker, args.interval)
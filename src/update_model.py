@@ -0,0 +1,140 @@
+"""
+INCREMENTAL MODEL UPDATE
+Cheap refresh between full retrains. Takes the current models/{ticker}.pkl and
+updates it on the newest bars only:
+  - Random Forest / Gradient Boosting: warm start, adding NEW_TREES trees or
+    boosting stages fitted on the recent window, up to MAX_ESTIMATORS
+    (after that the drift monitor asks for a full retrain)
+  - Streaming SGD (train_stream.py): partial_fit on the recent window
+  - anything else: refit on the recent window
+
+The updated model is compared with the current one on the most recent HOLDOUT
+rows. If it is strictly more accurate with no worse log loss, the same update
+is redone on the window plus the holdout (so the newest bars are learned too)
+and replaces the current model atomically.
+
+Every saved model records the last bar it was fitted on (fitted_through_), and
+the holdout only uses bars after it. After a promotion the next update waits
+until at least MIN_HOLDOUT unseen bars have come in.
+
+Usage: python src/update_model.py [TICKER ...]
+"""
+
+import copy
+import os
+import sys
+import joblib
+import pandas as pd
+from sklearn.base import clone
+from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
+from sklearn.metrics import accuracy_score, log_loss
+from sklearn.pipeline import Pipeline
+
+from generate_signals import model_features
+
+tickers = ['AAPL', 'MSFT', 'GOOGL', 'AMZN', 'NVDA']
+
+UPDATE_WINDOW = 250    # most recent rows the update is fitted on
+HOLDOUT = 40           # rows after the update window used to compare models
+MIN_HOLDOUT = 20       # fewer unseen rows than this: skip the update
+NEW_TREES = 20         # trees / boosting stages added per update
+MAX_ESTIMATORS = 300   # size cap; past this only a full retrain helps
+
+
+def at_capacity(model):
+    """True if another warm-start update would take a tree model past MAX_ESTIMATORS."""
+    return (isinstance(model, (RandomForestClassifier, GradientBoostingClassifier))
+            and model.n_estimators + NEW_TREES > MAX_ESTIMATORS)
+
+
+def warm_start_update(model, X, y):
+    """Return an updated copy of model; the original is left untouched."""
+    updated = copy.deepcopy(model)
+
+    if isinstance(updated, Pipeline) and hasattr(updated[-1], 'partial_fit'):
+        updated[-1].partial_fit(updated[:-1].transform(X), y)
+    elif isinstance(updated, (RandomForestClassifier, GradientBoostingClassifier)):
+        updated.set_params(warm_start=True,
+                           n_estimators=updated.n_estimators + NEW_TREES)
+        updated.fit(X, y)
+    else:
+        updated = clone(model).fit(X, y)
+
+    return updated
+
+
+def save_model_atomic(model, path):
+    """Write to a temp file first so a crash never leaves a half-written model."""
+    tmp_path = f'{path}.tmp'
+    joblib.dump(model, tmp_path)
+    os.replace(tmp_path, path)
+
+
+def update_ticker(ticker):
+    """Update one ticker's model. Returns True if the update was promoted."""
+    model_path = f'models/{ticker}.pkl'
+    if not os.path.exists(model_path):
+        print(f"{ticker}: no model at {model_path}, run a full retrain first")
+        return False
+
+    df = pd.read_csv(f'data/{ticker}_features.csv')
+    # The last row's target looks at a bar that doesn't exist yet
+    df = df.iloc[:-1]
+
+    # Use exactly the columns the model was trained on (it may be pruned or
+    # come from a different trainer than the current feature file layout)
+    current = joblib.load(model_path)
+    if at_capacity(current):
+        print(f"{ticker}: model has {current.n_estimators} estimators "
+              f"(cap {MAX_ESTIMATORS}), needs a full retrain\n")
+        return False
+
+    feature_cols = model_features(current)
+    X = df[feature_cols]
+    y = df['target']
+
+    # [ ... update window ... ][gap][ holdout ]
+    # One-row gap so no update label looks into the holdout, and the holdout
+    # never includes a bar the current model was fitted on
+    hold_start = len(df) - HOLDOUT
+    fitted_through = getattr(current, 'fitted_through_', None)
+    if fitted_through is not None:
+        dates = pd.to_datetime(df['Date'])
+        first_unseen = dates.searchsorted(pd.Timestamp(fitted_through), side='right')
+        hold_start = max(hold_start, first_unseen + 1)
+    if len(df) - hold_start < MIN_HOLDOUT:
+        print(f"{ticker}: only {max(len(df) - hold_start, 0)} unseen rows "
+              f"(need {MIN_HOLDOUT}), keeping current model\n")
+        return False
+    win_start = max(hold_start - 1 - UPDATE_WINDOW, 0)
+    X_new, y_new = X.iloc[win_start:hold_start - 1], y.iloc[win_start:hold_start - 1]
+    X_hold, y_hold = X.iloc[hold_start:], y.iloc[hold_start:]
+
+    candidate = warm_start_update(current, X_new, y_new)
+
+    cur_acc = accuracy_score(y_hold, current.predict(X_hold))
+    new_acc = accuracy_score(y_hold, candidate.predict(X_hold))
+    cur_loss = log_loss(y_hold, current.predict_proba(X_hold), labels=[0, 1])
+    new_loss = log_loss(y_hold, candidate.predict_proba(X_hold), labels=[0, 1])
+
+    print(f"{ticker}: current  acc {cur_acc:.4f}  log loss {cur_loss:.4f}")
+    print(f"{ticker}: updated  acc {new_acc:.4f}  log loss {new_loss:.4f}")
+
+    # Strictly better accuracy, and no worse calibration
+    if new_acc > cur_acc and new_loss <= cur_loss:
+        # The holdout only decides; the promoted model is refit with the same
+        # step on the window *including* the holdout, so it has seen the
+        # newest bars
+        candidate = warm_start_update(current, X.iloc[win_start:], y.iloc[win_start:])
+        candidate.fitted_through_ = str(df['Date'].iloc[-1])
+        save_model_atomic(candidate, model_path)
+        print(f">>> Promoted updated model to {model_path}\n")
+        return True
+
+    print(">>> Kept current model\n")
+    return False
+
+
+if __name__ == '__main__':
+    for ticker in sys.argv[1:] or tickers:
+        update_ticker(ticker)